@@ -1,7 +1,11 @@
 import os
+import hashlib
 import logging
+from typing import Optional
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+
+from etl_pnad.manifest import StageManifest, stage_key
 
 # Configuração básica de logging\logger = logging.getLogger(__name__)
 logger = logging.getLogger(__name__)
@@ -17,7 +21,8 @@ logger.setLevel(logging.INFO)
 
 def load_pnad_dictionary(
     xls_path: str,
-    dict_table: str = "pnad_dict"
+    dict_table: str = "pnad_dict",
+    manifest_path: Optional[str] = None
 ) -> None:
     """
     Carrega o dicionário PNAD de um arquivo Excel (.xls ou .xlsx) para uma tabela SQL,
@@ -26,6 +31,8 @@ def load_pnad_dictionary(
     Parâmetros:
     - xls_path: Caminho para o arquivo Excel do dicionário.
     - dict_table: Nome da tabela de destino no banco.
+    - manifest_path: Manifesto de etapas; se informado, a carga é pulada
+      quando o arquivo Excel não mudou e a tabela ainda existe.
     """
     logger.info(f"Iniciando carga do dicionário PNAD a partir de: {xls_path}")
 
@@ -39,6 +46,16 @@ def load_pnad_dictionary(
         raise EnvironmentError("Conexão SQLAlchemy não configurada. Defina AIRFLOW__CORE__SQL_ALCHEMY_CONN")
     engine = create_engine(conn_str)
 
+    manifest = StageManifest(manifest_path) if manifest_path else None
+    if manifest:
+        inputs = {"xlsx": manifest.digest(xls_path)}
+        params = {"dict_table": dict_table}
+        key = stage_key(inputs, params)
+        if manifest.is_fresh("load_dictionary", key) and inspect(engine).has_table(dict_table):
+            logger.info(f"⏭️ Dicionário inalterado, carga de '{dict_table}' ignorada")
+            return
+        manifest.invalidate("load_dictionary")
+
     # Detecta engine de leitura
     ext = os.path.splitext(xls_path)[1].lower()
     engine_name = "xlrd" if ext == ".xls" else "openpyxl"
@@ -67,6 +84,16 @@ def load_pnad_dictionary(
         df.to_sql(dict_table, engine, if_exists="replace", index=False)
         logger.info(f"✅ Dicionário carregado em '{dict_table}' com {len(df):,} registros")
 
+        if manifest:
+            # Impressão digital do conteúdo, independente dos bytes do Excel
+            conteudo = hashlib.sha256(
+                pd.util.hash_pandas_object(df, index=False).values.tobytes()
+            ).hexdigest()
+            manifest.record(
+                "load_dictionary", key, inputs, params,
+                outputs={"linhas": len(df), "conteudo": conteudo}
+            )
+
     except Exception:
         logger.exception("Falha durante o processamento do dicionário PNAD")
         raise
@@ -5,6 +5,8 @@ from typing import Optional
 from urllib.parse import urlparse
 import pandas as pd
 
+from etl_pnad.manifest import StageManifest, remote_fingerprint, stage_key
+
 # Configuração básica de logging (caso não esteja configurado globalmente)
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -44,10 +46,14 @@ def download_pnad_microdados(
     ano: int,
     trimestre: int,
     destino_pasta: str = "/opt/airflow/dados",
-    nome_arquivo: Optional[str] = None
+    nome_arquivo: Optional[str] = None,
+    manifest_path: Optional[str] = None
 ) -> None:
     """
     Baixa o microdados PNAD para o ano e trimestre especificados.
+
+    Se manifest_path for informado, o download é pulado quando o arquivo
+    remoto (ETag/Last-Modified/Content-Length) e o arquivo local não mudaram.
     """
     logger.info(f"Preparando download de microdados PNAD: ano={ano}, trimestre={trimestre}")
     url = (
@@ -58,16 +64,38 @@ def download_pnad_microdados(
     parsed = urlparse(url)
     arquivo = nome_arquivo or os.path.basename(parsed.path).strip()
     destino = os.path.join(destino_pasta, arquivo)
+    manifest = StageManifest(manifest_path) if manifest_path else None
+    if manifest:
+        inputs = {"url": url, "remote": remote_fingerprint(url)}
+        params = {"destino": destino}
+        key = stage_key(inputs, params)
+        if inputs["remote"] and manifest.is_fresh("download_microdados", key):
+            logger.info(f"⏭️ Microdados inalterados, download ignorado: {destino}")
+            return
+        manifest.invalidate("download_microdados")
+
     logger.info(f"📥 Preparando download dos microdados para: {destino}")
     download_arquivo(url, destino)
 
+    if manifest:
+        sha = manifest.digest(destino)
+        manifest.record(
+            "download_microdados", key, inputs, params,
+            outputs={"zip": sha}, files={destino: sha}
+        )
+
 
 def download_dicionario_pnad_2022(
-    destino_pasta: str = "/opt/airflow/dados"
+    destino_pasta: str = "/opt/airflow/dados",
+    manifest_path: Optional[str] = None
 ) -> None:
     """
     Baixa o dicionário PNAD Microdados 2022 (visita 1) em Excel (.xls)
     e converte para o formato .xlsx.
+
+    Se manifest_path for informado, o download é pulado quando o arquivo
+    remoto não mudou, e a conversão é pulada quando o .xls baixado é
+    idêntico ao da última execução.
     """
     xls_url = (
         "https://ftp.ibge.gov.br/Trabalho_e_Rendimento/"
@@ -78,12 +106,40 @@ def download_dicionario_pnad_2022(
     parsed = urlparse(xls_url)
     arquivo_xls = os.path.basename(parsed.path).strip()
     path_xls = os.path.join(destino_pasta, arquivo_xls)
+    path_xlsx = path_xls.replace(".xls", ".xlsx")
+
+    manifest = StageManifest(manifest_path) if manifest_path else None
+    if manifest:
+        inputs = {"url": xls_url, "remote": remote_fingerprint(xls_url)}
+        params = {"destino_xls": path_xls, "destino_xlsx": path_xlsx}
+        key = stage_key(inputs, params)
+        if inputs["remote"] and manifest.is_fresh("download_dicionario", key):
+            logger.info(f"⏭️ Dicionário inalterado, download ignorado: {path_xls}")
+            return
+        anterior = manifest.stage("download_dicionario")
+        manifest.invalidate("download_dicionario")
 
     logger.info(f"📥 Preparando download do dicionário PNAD 2022 para: {path_xls}")
     download_arquivo(xls_url, path_xls)
 
+    if manifest:
+        sha_xls = manifest.digest(path_xls)
+        # Reconverter geraria um .xlsx com bytes diferentes (metadados de
+        # data), invalidando as etapas seguintes sem necessidade
+        if (
+            anterior
+            and anterior["outputs"].get("xls") == sha_xls
+            and os.path.exists(path_xlsx)
+            and manifest.digest(path_xlsx) == anterior["outputs"].get("xlsx")
+        ):
+            logger.info(f"⏭️ XLS idêntico ao anterior, conversão ignorada: {path_xlsx}")
+            manifest.record(
+                "download_dicionario", key, inputs, params,
+                outputs=anterior["outputs"], files=anterior["files"]
+            )
+            return
+
     # Conversão para XLSX
-    path_xlsx = path_xls.replace(".xls", ".xlsx")
     logger.info(f"🔄 Convertendo para XLSX: {path_xls} → {path_xlsx}")
     try:
         # Lê todas as abas do .xls com engine xlrd
@@ -96,3 +152,11 @@ def download_dicionario_pnad_2022(
     except Exception as e:
         logger.error(f"❌ Erro durante a conversão para XLSX: {e}")
         raise
+
+    if manifest:
+        sha_xlsx = manifest.digest(path_xlsx)
+        manifest.record(
+            "download_dicionario", key, inputs, params,
+            outputs={"xls": sha_xls, "xlsx": sha_xlsx},
+            files={path_xls: sha_xls, path_xlsx: sha_xlsx}
+        )
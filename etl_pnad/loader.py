@@ -2,8 +2,11 @@ import os
 import logging
 import psycopg2
 from psycopg2 import sql
+from typing import Optional
 from dotenv import load_dotenv
 
+from etl_pnad.manifest import StageManifest, stage_key
+
 # ─── Logging ─────────────────────────────────────────────────────────
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -50,7 +53,10 @@ def create_table_from_dict(conn, dict_table: str, target_table: str) -> None:
     logger.info(f"✅ Tabela '{target_table}' pronta")
 
 
-def populate_final_table(conn, dict_table: str, staging_table: str, target_table: str) -> None:
+def populate_final_table(conn, dict_table: str, staging_table: str, target_table: str) -> int:
+    """
+    Insere os dados do staging na tabela final e retorna o número de linhas.
+    """
     logger.info(f"▶️ Populando '{target_table}' a partir de '{staging_table}'")
     with conn.cursor() as cur:
         logger.info(f"🧹 Limpando tabela '{target_table}' antes da carga")
@@ -101,15 +107,46 @@ def populate_final_table(conn, dict_table: str, staging_table: str, target_table
         )
         logger.info(f"SQL de inserção gerado:\n{insert_sql.as_string(conn)}")
         cur.execute(insert_sql)
+        linhas = cur.rowcount
     conn.commit()
     logger.info(f"✅ Dados inseridos em '{target_table}'")
+    return linhas
+
+
+def table_exists(conn, table: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (table,))
+        return cur.fetchone()[0] is not None
 
 def main(
     dict_table: str = "pnad_dict",
     staging_table: str = "pnad_staging_raw",
-    target_table: str = "pnad_educacao"
+    target_table: str = "pnad_educacao",
+    manifest_path: Optional[str] = None
 ) -> None:
+    """
+    Recria a tabela final a partir do dicionário e do staging.
+
+    Se manifest_path for informado, a carga é pulada quando as saídas de
+    'load_dictionary' e 'run_staging' registradas no manifesto não mudaram.
+    """
     logger.info("=== Iniciando carga dinâmica PNAD Educação ===")
+    manifest = StageManifest(manifest_path) if manifest_path else None
+    key = None
+    if manifest:
+        inputs = {
+            "load_dictionary": manifest.outputs("load_dictionary"),
+            "run_staging": manifest.outputs("run_staging"),
+        }
+        params = {
+            "dict_table": dict_table,
+            "staging_table": staging_table,
+            "target_table": target_table,
+        }
+        # Sem registro das etapas anteriores não há como garantir o cache
+        if all(inputs.values()):
+            key = stage_key(inputs, params)
+
     conn = None
     try:
         conn = psycopg2.connect(
@@ -121,8 +158,20 @@ def main(
         )
         logger.info("🔌 Conectado ao PostgreSQL")
 
+        if key and manifest.is_fresh("load_to_postgres", key) and table_exists(conn, target_table):
+            logger.info(f"⏭️ Dicionário e staging inalterados, carga de '{target_table}' ignorada")
+            return
+        if manifest:
+            manifest.invalidate("load_to_postgres")
+
         create_table_from_dict(conn, dict_table, target_table)
-        populate_final_table(conn, dict_table, staging_table, target_table)
+        linhas = populate_final_table(conn, dict_table, staging_table, target_table)
+
+        if key:
+            manifest.record(
+                "load_to_postgres", key, inputs, params,
+                outputs={"linhas": linhas}
+            )
 
     except Exception:
         logger.exception("❌ Erro durante a carga dinâmica")
@@ -0,0 +1,192 @@
+import os
+import json
+import fcntl
+import hashlib
+import logging
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+# Configuração básica de logging
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+MANIFEST_VERSION = 1
+
+
+def stage_key(inputs: Dict[str, Any], params: Dict[str, Any]) -> str:
+    """
+    Calcula a chave de uma etapa a partir das entradas e parâmetros.
+    A serialização é canônica (chaves ordenadas) para a chave ser estável.
+    """
+    payload = json.dumps(
+        {"inputs": inputs, "params": params}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def remote_fingerprint(url: str) -> Optional[Dict[str, str]]:
+    """
+    Consulta ETag, Last-Modified e Content-Length de uma URL via HEAD.
+    Retorna None se o servidor não responder ou não informar nenhum validador.
+    """
+    try:
+        resp = requests.head(url, allow_redirects=True, timeout=30)
+        resp.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Não foi possível consultar {url} via HEAD: {e}")
+        return None
+    validadores = {
+        h: resp.headers[h]
+        for h in ("ETag", "Last-Modified", "Content-Length")
+        if resp.headers.get(h)
+    }
+    return validadores or None
+
+
+class StageManifest:
+    """
+    Manifesto em JSON com o estado das etapas do pipeline.
+
+    Para cada etapa guarda a chave (hash das entradas e parâmetros), as
+    saídas e os arquivos produzidos com seus SHA-256. Também memoriza o
+    hash de cada arquivo por (tamanho, mtime), evitando reler arquivos
+    grandes que não mudaram.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock_path = f"{path}.lock"
+
+    # ─── Persistência ────────────────────────────────────────────
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "files": {}, "stages": {}}
+        except ValueError:
+            logger.warning(f"Manifesto inválido, ignorando: {self.path}")
+            return {"version": MANIFEST_VERSION, "files": {}, "stages": {}}
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Versão de manifesto incompatível, ignorando: {self.path}")
+            return {"version": MANIFEST_VERSION, "files": {}, "stages": {}}
+        data.setdefault("files", {})
+        data.setdefault("stages", {})
+        return data
+
+    def _update(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Aplica fn ao manifesto sob lock exclusivo e grava de forma atômica,
+        já que tarefas paralelas do Airflow compartilham o mesmo arquivo.
+        """
+        dest_dir = os.path.dirname(self.path) or "."
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(self._lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = self._read()
+            fn(data)
+            fd, tmp = tempfile.mkstemp(dir=dest_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp, self.path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+    # ─── Arquivos ────────────────────────────────────────────────
+    def digest(self, path: str) -> str:
+        """
+        Retorna o SHA-256 de um arquivo, reaproveitando o valor memorizado
+        quando tamanho e mtime não mudaram.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        memo = self._read()["files"].get(path)
+        if memo and memo["size"] == st.st_size and memo["mtime_ns"] == st.st_mtime_ns:
+            return memo["sha256"]
+
+        logger.info(f"🔑 Calculando SHA-256: {path}")
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        sha = h.hexdigest()
+
+        def _memo(data):
+            data["files"][path] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": sha,
+            }
+        self._update(_memo)
+        return sha
+
+    # ─── Etapas ──────────────────────────────────────────────────
+    def stage(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._read()["stages"].get(name)
+
+    def outputs(self, name: str) -> Optional[Dict[str, Any]]:
+        entry = self.stage(name)
+        return entry["outputs"] if entry else None
+
+    def is_fresh(self, name: str, key: str) -> bool:
+        """
+        Indica se a etapa já foi executada com a mesma chave e se todos os
+        arquivos que ela produziu continuam intactos.
+        """
+        entry = self.stage(name)
+        if not entry or entry["key"] != key:
+            return False
+        for path, sha in entry["files"].items():
+            if not os.path.exists(path) or self.digest(path) != sha:
+                logger.info(f"Saída de '{name}' alterada ou ausente: {path}")
+                return False
+        return True
+
+    def invalidate(self, name: str) -> None:
+        """
+        Remove a etapa do manifesto. Chamado antes de executá-la, para que
+        uma falha no meio do caminho não deixe uma entrada válida para trás.
+        """
+        self._update(lambda data: data["stages"].pop(name, None))
+
+    def record(
+        self,
+        name: str,
+        key: str,
+        inputs: Dict[str, Any],
+        params: Dict[str, Any],
+        outputs: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Registra uma execução bem-sucedida da etapa.
+
+        Parâmetros:
+        - files: arquivos produzidos, mapeados para seus SHA-256.
+        """
+        entry = {
+            "key": key,
+            "inputs": inputs,
+            "params": params,
+            "outputs": outputs or {},
+            "files": {os.path.abspath(p): sha for p, sha in (files or {}).items()},
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        def _record(data):
+            data["stages"][name] = entry
+        self._update(_record)
+        logger.info(f"📝 Etapa '{name}' registrada no manifesto")
@@ -33,6 +33,7 @@ default_args = {
 }
 
 BASE_DIR = "/opt/airflow/dados"
+MANIFEST_PATH = f"{BASE_DIR}/.pnad_manifest.json"  # cache de etapas entre execuções
 
 # ─── DAG definition ───────────────────────────────────────
 with DAG(
@@ -48,13 +49,13 @@ with DAG(
     dl_micro = PythonOperator(
         task_id="download_microdados",
         python_callable=download_pnad_microdados,
-        op_kwargs=dict(ano=2022, trimestre=4, destino_pasta=BASE_DIR),
+        op_kwargs=dict(ano=2022, trimestre=4, destino_pasta=BASE_DIR, manifest_path=MANIFEST_PATH),
     )
 
     dl_dict = PythonOperator(
         task_id="download_dicionario",
         python_callable=download_dicionario_pnad_2022,
-        op_kwargs=dict(destino_pasta=BASE_DIR),
+        op_kwargs=dict(destino_pasta=BASE_DIR, manifest_path=MANIFEST_PATH),
     )
 
     # 2) Dicionário → Postgres --------------------------------------
@@ -64,6 +65,7 @@ with DAG(
         op_kwargs=dict(
             xls_path=f"{BASE_DIR}/dicionario_PNADC_microdados_2022_visita1_20231129.xlsx",
             dict_table="pnad_dict",
+            manifest_path=MANIFEST_PATH,
         ),
     )
 
@@ -76,6 +78,7 @@ with DAG(
             raw_dir=f"{BASE_DIR}/raw/PNADC_042022",
             db_table="pnad_staging_raw",
             chunksize=50_000,
+            manifest_path=MANIFEST_PATH,
         ),
     )
 
@@ -87,6 +90,7 @@ with DAG(
             dict_table="pnad_dict",
             staging_table="pnad_staging_raw",
             target_table="pnad_educacao",
+            manifest_path=MANIFEST_PATH,
         ),
     )
 
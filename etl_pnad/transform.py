@@ -3,7 +3,9 @@ import logging
 from zipfile import ZipFile
 from typing import List, Tuple, Optional
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+
+from etl_pnad.manifest import StageManifest, stage_key
 
 # Configuração básica de logging
 logger = logging.getLogger(__name__)
@@ -81,10 +83,17 @@ def run_transform_pipeline(
     zip_path: str,
     raw_dir: str,
     db_table: str = "pnad_staging_raw",
-    chunksize: int = 50_000
+    chunksize: int = 50_000,
+    manifest_path: Optional[str] = None
 ) -> None:
+    """
+    Descompacta os microdados e carrega o TXT na tabela de staging.
+
+    Se manifest_path for informado, a etapa é pulada quando o ZIP e o
+    layout do dicionário não mudaram; a descompactação também é pulada
+    quando o TXT extraído do mesmo ZIP continua intacto.
+    """
     logger.info("=== Iniciando staging bruto PNAD Educação ===")
-    descompactar(zip_path, raw_dir)
 
     conn_str = os.getenv("AIRFLOW__CORE__SQL_ALCHEMY_CONN")
     if not conn_str:
@@ -105,6 +114,38 @@ def run_transform_pipeline(
     logger.info(f"📑 Colspecs gerados: {len(colspecs)} colunas")
 
     txt_file = os.path.join(raw_dir, os.path.basename(zip_path).replace(".zip", ".txt"))
+
+    manifest = StageManifest(manifest_path) if manifest_path else None
+    if manifest:
+        if not os.path.exists(zip_path):
+            logger.error(f"ZIP não encontrado: {zip_path}")
+            raise FileNotFoundError(f"ZIP não encontrado: {zip_path}")
+        inputs = {
+            "zip": manifest.digest(zip_path),
+            "colspecs": stage_key({"colspecs": [[int(a), int(b)] for a, b in colspecs]}, {}),
+        }
+        params = {"db_table": db_table}
+        key = stage_key(inputs, params)
+        if manifest.is_fresh("run_staging", key) and inspect(engine).has_table(db_table):
+            logger.info(f"⏭️ ZIP e dicionário inalterados, staging de '{db_table}' ignorado")
+            return
+        manifest.invalidate("run_staging")
+
+        extract_inputs = {"zip": inputs["zip"]}
+        extract_params = {"raw_dir": raw_dir}
+        extract_key = stage_key(extract_inputs, extract_params)
+        if manifest.is_fresh("run_staging.descompactar", extract_key):
+            logger.info(f"⏭️ TXT já extraído deste ZIP, descompactação ignorada: {txt_file}")
+        else:
+            manifest.invalidate("run_staging.descompactar")
+            descompactar(zip_path, raw_dir)
+            manifest.record(
+                "run_staging.descompactar", extract_key, extract_inputs, extract_params,
+                files={txt_file: manifest.digest(txt_file)}
+            )
+    else:
+        descompactar(zip_path, raw_dir)
+
     cols = [f"col{i+1}" for i in range(len(colspecs))]
 
     reader = pd.read_fwf(
@@ -115,8 +156,16 @@ def run_transform_pipeline(
         encoding="latin1",
         chunksize=chunksize
     )
+    total = 0
     for i, chunk in enumerate(reader, start=1):
         mode = 'replace' if i == 1 else 'append'
         chunk.to_sql(db_table, engine, if_exists=mode, index=False)
+        total += len(chunk)
         logger.info(f"✔️ Chunk {i} inserido em '{db_table}': {len(chunk):,} linhas")
+
+    if manifest:
+        manifest.record(
+            "run_staging", key, inputs, params,
+            outputs={**inputs, "linhas": total}
+        )
     logger.info("=== Staging bruto PNAD Educação concluído com sucesso ===")